@@ -10,13 +10,33 @@ from selectolax.parser import HTMLParser
 from urllib.parse import urljoin, urlparse
 import argparse
 import sys, os
-from typing import List, Set, Optional
+from typing import List, Set, Dict, Optional, Iterable, Iterator, Tuple, NamedTuple
 import time
 import random
 from tqdm.asyncio import tqdm
 import threading
 from colorama import Fore, init
 import re
+import io
+import gzip
+import zlib
+import bz2
+import lzma
+import mmap
+import itertools
+import hashlib
+import base64
+import uuid
+import errno
+import calendar
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+from collections import OrderedDict, deque
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 # Initialize Colorama
 init(autoreset=True)
@@ -57,16 +77,702 @@ def clear_terminal():
         print(f"{R}Gagal membersihkan terminal: {e}{W}")
 
 
+class CapturedResponse(NamedTuple):
+    """Snapshot response untuk arsip WARC (body dipotong sampai batas capture)"""
+    status_code: int
+    reason_phrase: str
+    http_version: str
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+    truncated: bool
+    # WARC-Payload-Digest body; tetap ada walau body dibuang dari cache redirect
+    digest: str = ''
+
+
+class FetchOutcome(NamedTuple):
+    """Hasil fetch satu URL setelah semua redirect diikuti"""
+    classification: dict
+    redirect_chain: List[str]
+    final_url: str
+    capture: Optional[CapturedResponse] = None
+    # Status dan latency hop pertama, satu-satunya request yang pasti dikirim lewat egress pemanggil
+    # (hop berikutnya bisa berasal dari cache/fetch bersama egress lain)
+    request_status: int = 0
+    request_seconds: float = 0.0
+
+
+DEFAULT_CAPTURE_BODY_LIMIT = 256 * 1024
+# Jumlah (URL, digest) yang diingat untuk menulis record revisit alih-alih body yang sama
+CAPTURE_REF_SIZE = 50000
+# Body record asli yang disimpan saat replay untuk record revisit yang sering merujuknya
+REVISIT_BODY_CACHE_SIZE = 64
+REVISIT_PROFILE = 'http://netpreserve.org/warc/1.0/revisit/identical-payload-digest'
+# Body disimpan setelah di-decode httpx, jadi header encoding asli tidak lagi valid
+SKIPPED_CAPTURE_HEADERS = (b'content-encoding', b'transfer-encoding', b'content-length')
+
+
+class WarcWriter:
+    """Tulis response hasil scan sebagai record WARC/1.0 (gzip per record jika .gz)
+
+    Response dengan URL akhir dan body yang sama dengan record sebelumnya
+    (landing page bersama hasil redirect) ditulis sebagai record `revisit`
+    yang merujuk record asli, bukan menyalin body-nya lagi.
+    """
+
+    def __init__(self, path: str, body_limit: int = DEFAULT_CAPTURE_BODY_LIMIT, ref_size: int = CAPTURE_REF_SIZE):
+        self.path = path
+        self.body_limit = body_limit
+        self.compress = path.endswith('.gz')
+        self.ref_size = ref_size
+        self.records = 0
+        self.revisits = 0
+        # (URL akhir, digest) -> (WARC-Record-ID, WARC-Date, offset) record response asli
+        self._refs: OrderedDict = OrderedDict()
+        self._file = open(path, 'wb')
+        self._write_record('warcinfo', [('Content-Type', 'application/warc-fields')],
+                           b'software: bx-spider\r\nformat: WARC File Format 1.0\r\n')
+
+    def snapshot(self, response: httpx.Response) -> CapturedResponse:
+        content = response.content
+        headers = [(name, value) for name, value in response.headers.raw
+                   if name.lower() not in SKIPPED_CAPTURE_HEADERS]
+        body = content[:self.body_limit]
+        return CapturedResponse(
+            response.status_code,
+            response.reason_phrase,
+            response.http_version,
+            headers,
+            body,
+            len(content) > self.body_limit,
+            'sha1:' + base64.b32encode(hashlib.sha1(body).digest()).decode('ascii')
+        )
+
+    def has_record(self, final_url: str, captured: CapturedResponse) -> bool:
+        """True jika body ini sudah ada di arsip sehingga bisa ditulis sebagai revisit"""
+        return (final_url, captured.digest) in self._refs
+
+    def write_response(self, url: str, redirect_chain: List[str], final_url: str, captured: CapturedResponse):
+        """Tulis satu record response (atau revisit); URL scan asli dan rantai redirect disimpan di header WARC-Bx-*"""
+        http_head = (
+            f"{captured.http_version} {captured.status_code} {captured.reason_phrase}\r\n".encode('latin-1', 'replace')
+            + b''.join(name + b': ' + value + b'\r\n' for name, value in captured.headers)
+            + b'\r\n'
+        )
+        headers = [
+            ('WARC-Target-URI', final_url),
+            ('Content-Type', 'application/http; msgtype=response'),
+            ('WARC-Payload-Digest', captured.digest),
+            ('WARC-Bx-Scan-URL', url),
+        ]
+        if redirect_chain:
+            headers.append(('WARC-Bx-Redirect-Chain', ' '.join(redirect_chain)))
+
+        key = (final_url, captured.digest)
+        ref = self._refs.get(key)
+        if ref is not None:
+            self._refs.move_to_end(key)
+            record_id, date, offset = ref
+            headers += [
+                ('WARC-Profile', REVISIT_PROFILE),
+                ('WARC-Refers-To', record_id),
+                ('WARC-Refers-To-Target-URI', final_url),
+                ('WARC-Refers-To-Date', date),
+                ('WARC-Bx-Refers-To-Offset', str(offset)),
+            ]
+            self._write_record('revisit', headers, http_head)
+            self.revisits += 1
+            return
+
+        if captured.truncated:
+            headers.append(('WARC-Truncated', 'length'))
+        self._refs[key] = self._write_record('response', headers, http_head + captured.body)
+        while len(self._refs) > self.ref_size:
+            self._refs.popitem(last=False)
+
+    def _write_record(self, warc_type: str, headers: List[Tuple[str, str]], block: bytes) -> Tuple[str, str, int]:
+        """Tulis satu record, returns (WARC-Record-ID, WARC-Date, offset) untuk dirujuk revisit"""
+        record_id = f'<urn:uuid:{uuid.uuid4()}>'
+        date = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        lines = [
+            'WARC/1.0',
+            f'WARC-Type: {warc_type}',
+            f'WARC-Record-ID: {record_id}',
+            f"WARC-Date: {date}",
+            *(f'{name}: {value}' for name, value in headers),
+            f'Content-Length: {len(block)}',
+        ]
+        record = ('\r\n'.join(lines) + '\r\n\r\n').encode('utf-8') + block + b'\r\n\r\n'
+        offset = self._file.tell()
+        self._file.write(gzip.compress(record) if self.compress else record)
+        self.records += 1
+        return record_id, date, offset
+
+    def close(self):
+        self._file.close()
+
+
+def _read_warc_record(f) -> Optional[Tuple[Dict[str, str], bytes]]:
+    """Baca satu record WARC dari posisi stream saat ini, None jika sudah EOF"""
+    while True:
+        line = f.readline()
+        if not line:
+            return None
+        if line.strip():
+            break
+    if not line.startswith(b'WARC/'):
+        raise ValueError(f"Record WARC tidak valid: {line[:50]!r}")
+
+    headers: Dict[str, str] = {}
+    for line in iter(f.readline, b''):
+        if not line.strip():
+            break
+        name, _, value = line.decode('utf-8', errors='replace').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    return headers, f.read(int(headers.get('content-length', 0)))
+
+
+def iter_warc_responses(path: str) -> Iterator[Tuple[Dict[str, str], bytes]]:
+    """Stream record response dari arsip WARC (.warc atau .warc.gz) sebagai (header, block HTTP)
+
+    Record revisit digabung dengan body record response yang dirujuknya
+    (dibaca ulang lewat offset), sehingga setiap URL scan tetap menghasilkan
+    satu record lengkap.
+    """
+    compressed = path.endswith('.gz')
+    opener = gzip.open if compressed else open
+    bodies: OrderedDict = OrderedDict()
+    with opener(path, 'rb') as f, open(path, 'rb') as raw:
+        while True:
+            record = _read_warc_record(f)
+            if record is None:
+                return
+            headers, block = record
+            if headers.get('warc-type') == 'response':
+                yield headers, block
+            elif headers.get('warc-type') == 'revisit':
+                original_headers, body = _read_revisited_body(raw, headers, compressed, bodies)
+                if 'warc-truncated' in original_headers:
+                    headers['warc-truncated'] = original_headers['warc-truncated']
+                yield headers, block + body
+
+
+def _read_revisited_body(raw, headers: Dict[str, str], compressed: bool,
+                         bodies: OrderedDict) -> Tuple[Dict[str, str], bytes]:
+    """Ambil header WARC dan body HTTP record asli yang dirujuk record revisit (LRU kecil)"""
+    record_id = headers.get('warc-refers-to', '')
+    cached = bodies.get(record_id)
+    if cached is not None:
+        bodies.move_to_end(record_id)
+        return cached
+
+    raw.seek(int(headers['warc-bx-refers-to-offset']))
+    original = _read_warc_record(gzip.GzipFile(fileobj=raw) if compressed else raw)
+    if original is None or original[0].get('warc-record-id') != record_id:
+        raise ValueError(f"Record revisit merujuk record yang tidak ditemukan: {record_id}")
+    original_headers, original_block = original
+    cached = bodies[record_id] = (original_headers, original_block.partition(b'\r\n\r\n')[2])
+    while len(bodies) > REVISIT_BODY_CACHE_SIZE:
+        bodies.popitem(last=False)
+    return cached
+
+
+def parse_captured_response(block: bytes, truncated: bool = False) -> CapturedResponse:
+    """Parse block application/http menjadi CapturedResponse"""
+    head, _, body = block.partition(b'\r\n\r\n')
+    status_line, *header_lines = head.split(b'\r\n')
+    http_version, status_code, *reason = status_line.decode('latin-1').split(' ', 2)
+    headers = []
+    for line in header_lines:
+        name, _, value = line.partition(b':')
+        headers.append((name.strip(), value.strip()))
+    return CapturedResponse(int(status_code), reason[0] if reason else '', http_version, headers, body, truncated)
+
+
+ADAPTIVE_DEADLINE_MULTIPLIER = 3.0
+ADAPTIVE_MIN_DEADLINE = 2.0
+
+
+class LatencyTracker:
+    """Sliding window latency fetch yang berhasil untuk menghitung percentile"""
+
+    WARMUP_SAMPLES = 50
+
+    def __init__(self, window: int = 2000, refresh_every: int = 50):
+        self.samples = deque(maxlen=window)
+        self.refresh_every = refresh_every
+        self.count = 0
+        self._sorted: List[float] = []
+        self._since_refresh = 0
+
+    def add(self, seconds: float):
+        self.samples.append(seconds)
+        self.count += 1
+        self._since_refresh += 1
+
+    def percentile(self, p: float) -> float:
+        """Percentile p (0-100); urutan sampel di-refresh setiap refresh_every sampel"""
+        if not self._sorted or self._since_refresh >= self.refresh_every:
+            self._sorted = sorted(self.samples)
+            self._since_refresh = 0
+        if not self._sorted:
+            return 0.0
+        index = min(len(self._sorted) - 1, int(len(self._sorted) * p / 100))
+        return self._sorted[index]
+
+
+BIND_ERRNOS = {errno.EADDRNOTAVAIL, errno.EADDRINUSE, getattr(errno, 'WSAEADDRNOTAVAIL', None)} - {None}
+
+
+def _is_bind_error(error: BaseException) -> bool:
+    """True jika rantai penyebab error berisi kegagalan bind ke source address lokal"""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, OSError) and error.errno in BIND_ERRNOS:
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class Egress:
+    """Satu jalur keluar (proxy, source address atau direct) dengan skor kesehatan"""
+
+    EWMA_ALPHA = 0.1
+    LATENCY_REFERENCE = 2.0
+    MAX_CONSECUTIVE_FAILURES = 5
+    THROTTLE_LIMIT = 0.5
+    MIN_SAMPLES = 20
+    BASE_COOLDOWN = 30.0
+    MAX_COOLDOWN = 600.0
+
+    def __init__(self, name: str, client: httpx.AsyncClient, proxy: bool = False):
+        self.name = name
+        self.client = client
+        self.proxy = proxy
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+        self.error_rate = 0.0
+        self.throttle_rate = 0.0
+        self.latency = 0.0
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self.cooldowns = 0
+
+    @property
+    def score(self) -> float:
+        """Skor 0-1: turun karena error egress, 429 dan latency tinggi"""
+        latency_penalty = 1 + self.latency / self.LATENCY_REFERENCE
+        return max(0.01, (1 - self.error_rate) * (1 - self.throttle_rate) / latency_penalty)
+
+    def _caused_by_egress(self, error: Exception) -> bool:
+        if isinstance(error, httpx.ProxyError):
+            return True
+        if not isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout)):
+            return False
+        # Lewat proxy, koneksi langsung hanya ke proxy; target dihubungi oleh proxy.
+        # Source address yang tidak bisa di-bind membuat semua request gagal
+        return self.proxy or _is_bind_error(error)
+
+    def available(self, now: float) -> bool:
+        return now >= self.cooldown_until
+
+    def record(self, status_code: int, seconds: float, error: Optional[Exception] = None) -> bool:
+        """Catat hasil request dan masukkan ke cooldown jika egress bermasalah
+
+        Returns True jika kegagalan disebabkan egress (URL layak dicoba lewat egress lain).
+
+        Hanya kegagalan yang disebabkan egress yang dihitung: error proxy,
+        gagal konek ke proxy, gagal bind source address, dan 429. DNS error, timeout atau 5xx dari target
+        (umum di list domain expired) tidak menurunkan skor egress.
+        """
+        is_error = error is not None and self._caused_by_egress(error)
+        is_throttled = status_code == 429
+        alpha = self.EWMA_ALPHA
+
+        self.requests += 1
+        self.errors += is_error
+        self.throttled += is_throttled
+        self.error_rate += alpha * (is_error - self.error_rate)
+        self.throttle_rate += alpha * (is_throttled - self.throttle_rate)
+        self.latency += alpha * (seconds - self.latency)
+
+        if is_error or is_throttled:
+            self.consecutive_failures += 1
+        else:
+            self.consecutive_failures = 0
+
+        overloaded = self.requests >= self.MIN_SAMPLES and self.throttle_rate > self.THROTTLE_LIMIT
+        if self.consecutive_failures >= self.MAX_CONSECUTIVE_FAILURES or overloaded:
+            # Backoff eksponensial, lalu beri kesempatan lagi dengan skor setengah pulih
+            cooldown = min(self.MAX_COOLDOWN, self.BASE_COOLDOWN * 2 ** self.cooldowns)
+            self.cooldown_until = time.monotonic() + cooldown
+            self.cooldowns += 1
+            self.consecutive_failures = 0
+            self.error_rate /= 2
+            self.throttle_rate /= 2
+        return is_error or is_throttled
+
+
+def _egress_label(egress: Optional[str]) -> str:
+    """Nama egress untuk laporan, tanpa username/password proxy"""
+    if not egress:
+        return 'direct'
+    if '@' in egress and '://' in egress:
+        scheme, rest = egress.split('://', 1)
+        return f"{scheme}://{rest.rsplit('@', 1)[1]}"
+    return egress
+
+
+EGRESS_RETRIES = 2
+
+
+class EgressPool:
+    """Pool egress: bobot ke egress sehat, cooldown egress gagal, host di-pin ke satu egress"""
+
+    def __init__(self, egresses: List[Egress], pin_cache_size: int = 100000):
+        self.egresses = egresses
+        self.pin_cache_size = pin_cache_size
+        self._pins: OrderedDict = OrderedDict()
+
+    def pick(self, host: str) -> Egress:
+        """Pilih egress untuk host; host yang sama tetap lewat egress yang sama selama sehat"""
+        if len(self.egresses) == 1:
+            return self.egresses[0]
+
+        now = time.monotonic()
+        pinned = self._pins.get(host)
+        if pinned is not None and pinned.available(now):
+            self._pins.move_to_end(host)
+            return pinned
+
+        candidates = [egress for egress in self.egresses if egress.available(now)]
+        if candidates:
+            egress = random.choices(candidates, weights=[e.score for e in candidates])[0]
+        else:
+            # Semua sedang cooldown, pakai yang paling cepat pulih daripada berhenti
+            egress = min(self.egresses, key=lambda e: e.cooldown_until)
+        self._pin(host, egress)
+        return egress
+
+    def pick_other(self, host: str, exclude: List[Egress]) -> Optional[Egress]:
+        """Pilih egress lain yang tersedia untuk mengulang URL, None jika tidak ada"""
+        now = time.monotonic()
+        candidates = [egress for egress in self.egresses if egress not in exclude and egress.available(now)]
+        if not candidates:
+            return None
+        egress = random.choices(candidates, weights=[e.score for e in candidates])[0]
+        self._pin(host, egress)
+        return egress
+
+    def _pin(self, host: str, egress: Egress):
+        self._pins[host] = egress
+        self._pins.move_to_end(host)
+        while len(self._pins) > self.pin_cache_size:
+            self._pins.popitem(last=False)
+
+    async def aclose(self):
+        for egress in self.egresses:
+            await egress.client.aclose()
+
+
+DEFAULT_PROFILE_FILE = 'bx-spider-profile.folded'
+PROFILE_SAMPLE_INTERVAL = 0.005
+LOOP_MONITOR_INTERVAL = 0.05
+SLOW_CALLBACK_THRESHOLD = 0.1
+NULL_STAGE = contextlib.nullcontext()
+PROFILE_TOP_N = 10
+
+
+class StageTimer:
+    """Context manager pengukur waktu satu stage (juga dipakai di sekitar await)
+
+    Stage sinkron didorong ke `stack` agar waktunya bisa dikurangkan dari
+    stage yang membungkusnya (self time). Stage yang melewati await tidak
+    memakai stack, karena stage coroutine lain bisa berjalan di tengahnya.
+    """
+
+    __slots__ = ('name', 'stats', 'start', 'stack')
+
+    def __init__(self, name: str, stats: list, stack: Optional[list] = None):
+        self.name = name
+        self.stats = stats
+        self.start = 0.0
+        self.stack = stack
+
+    def __enter__(self):
+        if self.stack is not None:
+            self.stack.append(self.stats)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        self.stats[0] += 1
+        self.stats[1] += elapsed
+        if elapsed > self.stats[2]:
+            self.stats[2] = elapsed
+        if self.stack is not None:
+            self.stack.pop()
+            if self.stack:
+                # Waktu stage ini termasuk di total stage pembungkusnya
+                self.stack[-1][3] += elapsed
+                self.stack[-1][4].add(self.name)
+        return False
+
+
+def _frame_label(code, lineno: Optional[int] = None) -> str:
+    location = f"{os.path.basename(code.co_filename)}:{lineno or code.co_firstlineno}"
+    return f"{code.co_name} ({location})"
+
+
+def _awaiting_task(task: asyncio.Future, depth: int = 4) -> Optional[asyncio.Future]:
+    """Task yang sedang menunggu `task` (await langsung, wait_for atau wait), None jika tidak ada
+
+    Asyncio tidak menyimpan relasi ini secara publik, jadi diikuti lewat done
+    callback: task_wakeup milik task penunggu, atau future waiter yang dibuat
+    wait_for/wait (partial atau closure) yang callback-nya membangunkan task.
+    """
+    for callback, _ in getattr(task, '_callbacks', None) or ():
+        owner = getattr(callback, '__self__', None)
+        if isinstance(owner, asyncio.Task):
+            return owner
+        refs = list(getattr(callback, 'args', ()))
+        for cell in getattr(callback, '__closure__', None) or ():
+            with contextlib.suppress(ValueError):
+                refs.append(cell.cell_contents)
+        for ref in refs:
+            if isinstance(ref, asyncio.Task):
+                return ref
+            if depth and isinstance(ref, asyncio.Future):
+                parent = _awaiting_task(ref, depth - 1)
+                if parent is not None:
+                    return parent
+    return None
+
+
+def _coroutine_stack(coro) -> List[str]:
+    """Rantai await sebuah coroutine (terluar dulu) sampai future yang ditunggu"""
+    stack = []
+    while coro is not None:
+        frame = getattr(coro, 'cr_frame', None) or getattr(coro, 'gi_frame', None)
+        if frame is None:
+            if not hasattr(coro, 'cr_frame') and not hasattr(coro, 'gi_frame'):
+                stack.append(f"<{type(coro).__name__}>")
+            break
+        stack.append(_frame_label(frame.f_code, frame.f_lineno))
+        coro = getattr(coro, 'cr_await', None) or getattr(coro, 'gi_yieldfrom', None)
+    return stack
+
+
+class Profiler:
+    """Profiler mode --profile: sampling stack event loop, await stack task, loop lag dan timing per stage
+
+    Thread terpisah mengambil sampel stack thread event loop secara periodik
+    (flamegraph CPU). Coroutine monitor di dalam loop mengukur loop lag dan
+    mengambil sampel rantai await setiap task (flamegraph "menunggu apa").
+    Sampel yang diambil saat loop tidak merespons lebih dari
+    SLOW_CALLBACK_THRESHOLD dicatat sebagai slow callback.
+    """
+
+    def __init__(self, output_path: str = DEFAULT_PROFILE_FILE, interval: float = PROFILE_SAMPLE_INTERVAL):
+        self.output_path = output_path
+        self.interval = interval
+        self.stages: Dict[str, list] = {}
+        self._stage_stack: List[list] = []
+        self.cpu_stacks: Dict[str, int] = {}
+        self.await_stacks: Dict[str, int] = {}
+        self.slow_stacks: Dict[str, int] = {}
+        self.samples = 0
+        self.idle_samples = 0
+        self.loop_lag = LatencyTracker(window=10000)
+        self.max_loop_lag = 0.0
+        self.slow_callbacks = 0
+        self._heartbeat: Optional[float] = None
+        self._thread_id: Optional[int] = None
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    def stage(self, name: str, spans_await: bool = False) -> StageTimer:
+        """Timer stage; stats = [count, total, max, total stage di dalamnya, nama stage di dalamnya]"""
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = [0, 0.0, 0.0, 0.0, set()]
+        return StageTimer(name, stats, None if spans_await else self._stage_stack)
+
+    def start(self):
+        """Mulai sampling stack thread pemanggil (thread yang menjalankan event loop)"""
+        self._thread_id = threading.get_ident()
+        self._stop.clear()
+        self._sampler = threading.Thread(target=self._sample_loop, name='bx-profiler', daemon=True)
+        self._sampler.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._sampler:
+            self._sampler.join()
+            self._sampler = None
+        self._heartbeat = None
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code, frame.f_lineno))
+                frame = frame.f_back
+            stack.reverse()
+            folded = ';'.join(stack)
+
+            self.samples += 1
+            # Loop sedang menunggu I/O di selector = idle (menunggu network)
+            if 'selectors.py' in stack[-1] and stack[-1].startswith('select '):
+                self.idle_samples += 1
+            self.cpu_stacks[folded] = self.cpu_stacks.get(folded, 0) + 1
+
+            heartbeat = self._heartbeat
+            if heartbeat is not None and time.perf_counter() - heartbeat > LOOP_MONITOR_INTERVAL + SLOW_CALLBACK_THRESHOLD:
+                self.slow_stacks[folded] = self.slow_stacks.get(folded, 0) + 1
+
+    async def monitor_loop(self):
+        """Ukur loop lag dan ambil sampel rantai await semua task di event loop"""
+        current = asyncio.current_task()
+        self._heartbeat = time.perf_counter()
+        while True:
+            expected = time.perf_counter() + LOOP_MONITOR_INTERVAL
+            await asyncio.sleep(LOOP_MONITOR_INTERVAL)
+            now = time.perf_counter()
+            self._heartbeat = now
+
+            lag = max(0.0, now - expected)
+            self.loop_lag.add(lag)
+            self.max_loop_lag = max(self.max_loop_lag, lag)
+            if lag > SLOW_CALLBACK_THRESHOLD:
+                self.slow_callbacks += 1
+
+            self._sample_await_stacks(current)
+
+    def _sample_await_stacks(self, current: asyncio.Task):
+        """Satu sampel rantai await per task yang tidak sedang ditunggu task lain
+
+        Task anak (dari wait_for, ensure_future di _fetch_hedged) digabung di
+        bawah stack task yang menunggunya, sehingga konteks worker ->
+        check_single_url tetap utuh dan waktu menunggu tidak dihitung dua kali.
+        """
+        tasks = [task for task in asyncio.all_tasks() if task is not current]
+        parents = {task: _awaiting_task(task) for task in tasks}
+        waiting_on_child = set(parents.values())
+        stacks: Dict[asyncio.Future, List[str]] = {}
+
+        def full_stack(task) -> List[str]:
+            stack = stacks.get(task)
+            if stack is None:
+                # Isi dulu untuk memutus siklus (seharusnya tidak terjadi)
+                stack = stacks[task] = []
+                parent = parents.get(task)
+                prefix = full_stack(parent) if parent is not None and parent in parents else []
+                if prefix and prefix[-1].startswith('<'):
+                    # Penanda future yang ditunggu parent diganti stack task anak
+                    prefix = prefix[:-1]
+                stack.extend(prefix + _coroutine_stack(task.get_coro()))
+            return stack
+
+        for task in tasks:
+            if task in waiting_on_child:
+                continue
+            folded = ';'.join(full_stack(task))
+            if folded:
+                self.await_stacks[folded] = self.await_stacks.get(folded, 0) + 1
+
+    def write_folded(self) -> List[str]:
+        """Tulis stack dalam format folded (flamegraph.pl, speedscope, inferno)"""
+        root, ext = os.path.splitext(self.output_path)
+        outputs = [(self.output_path, self.cpu_stacks), (f"{root}.await{ext or '.folded'}", self.await_stacks)]
+        written = []
+        for path, stacks in outputs:
+            if not stacks:
+                continue
+            with open(path, 'w', encoding='utf-8') as f:
+                for folded, count in sorted(stacks.items()):
+                    f.write(f"{folded} {count}\n")
+            written.append(path)
+        return written
+
+    def print_report(self):
+        """Ringkasan: timing per stage, loop lag, hot-spot dan slow callback teratas"""
+        print(f"\n{Y}🔬 PROFILE:{W}")
+        if self.stages:
+            # total termasuk stage di dalamnya (misalnya classify memuat html_parse); self = tanpa stage tersebut
+            print(f"  {W}{'Stage':<18}{'count':>10}{'total':>12}{'self':>12}{'avg':>12}{'max':>12}")
+            for name, (count, total, longest, nested, children) in sorted(self.stages.items(), key=lambda item: -item[1][1]):
+                avg_ms = total / count * 1000 if count else 0.0
+                note = f"  (memuat {', '.join(sorted(children))})" if children else ''
+                print(f"  {G}{name:<18}{W}{count:>10}{total:>11.2f}s{total - nested:>11.2f}s"
+                      f"{avg_ms:>10.2f}ms{longest * 1000:>10.1f}ms{note}")
+
+        if self.loop_lag.count:
+            print(f"  {W}Loop lag p50/p99/max: {G}{self.loop_lag.percentile(50) * 1000:.1f}ms / "
+                  f"{self.loop_lag.percentile(99) * 1000:.1f}ms / {self.max_loop_lag * 1000:.1f}ms"
+                  f"{W} | slow callback (>{SLOW_CALLBACK_THRESHOLD * 1000:.0f}ms): {G}{self.slow_callbacks}")
+
+        if self.samples:
+            idle = self.idle_samples / self.samples * 100
+            print(f"  {W}Sampel CPU: {G}{self.samples}{W} (idle/menunggu network: {G}{idle:.1f}%{W})")
+
+            # Self time: frame paling dalam dari setiap sampel non-idle
+            hot: Dict[str, int] = {}
+            for folded, count in self.cpu_stacks.items():
+                leaf = folded.rsplit(';', 1)[-1]
+                if 'selectors.py' in leaf and leaf.startswith('select '):
+                    continue
+                hot[leaf] = hot.get(leaf, 0) + count
+            if hot:
+                print(f"  {W}Top {PROFILE_TOP_N} hot-spot (self):")
+                for leaf, count in sorted(hot.items(), key=lambda item: -item[1])[:PROFILE_TOP_N]:
+                    print(f"    {W}├─ {Y}{count / self.samples * 100:5.1f}% {W}{leaf}")
+
+        if self.slow_stacks:
+            print(f"  {W}Slow callback teratas:")
+            for folded, count in sorted(self.slow_stacks.items(), key=lambda item: -item[1])[:5]:
+                print(f"    {W}├─ {R}{count}x {W}{' <- '.join(reversed(folded.split(';')[-3:]))}")
+
+        for path in self.write_folded():
+            print(f"  {W}Flamegraph: {G}{path}{W}")
+
+
 class BxSpider:
-    def __init__(self, timeout: int = 10, max_redirects: int = 5):
+    def __init__(self, timeout: int = 10, max_redirects: int = 5, redirect_cache_size: int = 10000,
+                 content_memo_size: int = 10000, connect_timeout: Optional[float] = None,
+                 read_timeout: Optional[float] = None, adaptive_timeout: bool = False, hedge: bool = False,
+                 egresses: Optional[List[Optional[str]]] = None, capture_path: Optional[str] = None,
+                 capture_body_limit: int = DEFAULT_CAPTURE_BODY_LIMIT, load_user_agents: bool = True,
+                 profiler: Optional[Profiler] = None):
         self.timeout = timeout
+        self.connect_timeout = connect_timeout if connect_timeout is not None else timeout
+        self.read_timeout = read_timeout if read_timeout is not None else timeout
+        self.adaptive_timeout = adaptive_timeout
+        self.hedge = hedge
+        self.egresses = egresses or []
+        self.egress_pool: Optional[EgressPool] = None
+        self.capture_path = capture_path
+        self.capture_body_limit = capture_body_limit
+        self.capture_writer: Optional[WarcWriter] = None
+        self.profiler = profiler
+        self.replay_truncated = 0
         self.max_redirects = max_redirects
+        self.redirect_cache_size = redirect_cache_size
+        self.content_memo_size = content_memo_size
         self.wix_sites: List[dict] = []
         self.wordpress_sites: List[dict] = []
         self.no_template_sites: List[dict] = []
         self.scanned_urls: Set[str] = set()
         self.user_agents: List[str] = []
-        self._load_user_agents()
+        if load_user_agents:
+            self._load_user_agents()
         
         # Counters untuk real-time display
         self.wix_count = 0
@@ -76,6 +782,25 @@ class BxSpider:
         self.lock = threading.Lock()
         self.pbar = None
         self.timer_task = None
+
+        # Single-flight + cache LRU untuk tujuan redirect (landing page bersama)
+        # _redirect_flights: URL -> (future, pemilik); _redirect_waits: pemilik -> pemilik flight yang ditunggu
+        self._redirect_flights: Dict[str, Tuple[asyncio.Future, object]] = {}
+        self._redirect_waits: Dict[object, object] = {}
+        self._redirect_cache: OrderedDict = OrderedDict()
+        self.redirect_coalesced = 0
+
+        # Memo LRU klasifikasi berdasarkan hash body (status, encoding, blake2b)
+        self._content_memo: OrderedDict = OrderedDict()
+        self.content_memo_hits = 0
+        self.content_memo_lookups = 0
+
+        # Statistik latency untuk adaptive deadline dan hedged request
+        self.latency = LatencyTracker()
+        self.deadline_exceeded = 0
+        self.hedged_requests = 0
+        self.hedge_wins = 0
+        self.egress_retries = 0
         
     def _load_user_agents(self):
         """Memuat user agents dari file user-agents.txt"""
@@ -95,6 +820,25 @@ class BxSpider:
                 "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
             ]
     
+    def _make_client(self, egress: Optional[str] = None) -> httpx.AsyncClient:
+        """Buat client untuk satu egress: URL proxy (http/socks5), source address atau direct"""
+        transport = None
+        if egress and '://' in egress:
+            transport = httpx.AsyncHTTPTransport(proxy=httpx.Proxy(egress))
+        elif egress:
+            transport = httpx.AsyncHTTPTransport(local_address=egress)
+
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                self.timeout,
+                connect=self.connect_timeout,
+                read=self.read_timeout
+            ),
+            follow_redirects=False,
+            max_redirects=self.max_redirects,
+            transport=transport
+        )
+
     def _get_random_user_agent(self) -> str:
         """Mendapatkan user agent secara random"""
         return random.choice(self.user_agents)
@@ -102,356 +846,617 @@ class BxSpider:
 
     def _update_progress_description(self):
         """Update progress bar description dengan counter real-time"""
-        if self.pbar:
+        if self.pbar is not None:
             postfix_str = f"{ungu}Wix{W}: {G}{self.wix_count} {Y}| {ungu}WordPress{W}: {G}{self.wordpress_count} {Y}| {ungu}NoTemplate{W}: {G}{self.no_template_count}{W}"
-            self.pbar.set_postfix_str(postfix_str)
+            with self._stage('progress_postfix'):
+                self.pbar.set_postfix_str(postfix_str)
 
     async def _timer_updater(self):
         """Update progress bar setiap detik untuk menampilkan waktu yang berjalan"""
-        while self.pbar and not self.pbar.disable:
+        while self.pbar is not None and not self.pbar.disable:
             await asyncio.sleep(0.1)  # Update setiap 100ms untuk smooth animation
-            if self.pbar:
-                self.pbar.refresh()
+            if self.pbar is not None:
+                with self._stage('progress_refresh'):
+                    self.pbar.refresh()
 
-    async def check_single_url(self, client: httpx.AsyncClient, url: str) -> Optional[dict]:
+    async def check_single_url(self, client: httpx.AsyncClient, url: str, egress: Optional[Egress] = None) -> Optional[dict]:
         """Check single URL with comprehensive error handling"""
         try:
             # Normalize URL
-            if not url.startswith(('http://', 'https://')):
-                url = f'https://{url}'
-            
+            url = self._normalize_url(url)
+
             if url in self.scanned_urls:
                 return None
-                
+
             self.scanned_urls.add(url)
-            
+
             # Gunakan user agent random untuk setiap request
             headers = {"User-Agent": self._get_random_user_agent()}
-            response = await client.get(url, headers=headers)
-            
-            # ✅ CHECK SPECIFIC STATUS CODES BEFORE raise_for_status()
-            if response.status_code == 404:
-                result = {
-                    'url': url,
-                    'status_code': 404,
-                    'platform': 'Error',
-                    'indicator': 'Website tidak ditemukan (404 Not Found)',
-                    'title': 'Page Not Found',
-                    'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-                }
-                
-                with self.lock:
-                    self.no_template_sites.append(result)
-                    self.no_template_count += 1
-                    self._update_progress_description()
-                
-                return result
-            
-            elif response.status_code == 403:
-                result = {
-                    'url': url,
-                    'status_code': 403,
-                    'platform': 'Protected',
-                    'indicator': 'Akses ditolak (403 Forbidden) - Website mungkin diblokir atau dilindungi',
-                    'title': 'Access Forbidden',
-                    'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-                }
-                
-                with self.lock:
-                    self.no_template_sites.append(result)
-                    self.no_template_count += 1
-                    self._update_progress_description()
-                
-                return result
-            
-            elif response.status_code == 401:
-                result = {
-                    'url': url,
-                    'status_code': 401,
-                    'platform': 'Protected',
-                    'indicator': 'Memerlukan autentikasi (401 Unauthorized)',
-                    'title': 'Authentication Required',
-                    'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-                }
-                
-                with self.lock:
-                    self.no_template_sites.append(result)
-                    self.no_template_count += 1
-                    self._update_progress_description()
-                
-                return result
-            
-            elif response.status_code == 429:
-                result = {
-                    'url': url,
-                    'status_code': 429,
-                    'platform': 'Protected',
-                    'indicator': 'Rate limit exceeded (429 Too Many Requests) - Website membatasi akses',
-                    'title': 'Rate Limited',
-                    'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-                }
-                
-                with self.lock:
-                    self.no_template_sites.append(result)
-                    self.no_template_count += 1
-                    self._update_progress_description()
-                
-                return result
-            
-            elif response.status_code >= 500:
-                result = {
-                    'url': url,
-                    'status_code': response.status_code,
-                    'platform': 'Error',
-                    'indicator': f'Server error ({response.status_code}) - Website mengalami masalah server',
-                    'title': 'Server Error',
-                    'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-                }
-                
-                with self.lock:
-                    self.no_template_sites.append(result)
-                    self.no_template_count += 1
-                    self._update_progress_description()
-                
-                return result
-            
-            elif response.status_code == 202:
-                # Parse content untuk cek apakah benar-benar protected
-                try:
-                    parser = HTMLParser(response.text)
-                    
-                    # Check for WordPress first
-                    comment_form_comment = parser.css_first('.comment-form-comment')
-                    commentform_id = parser.css_first('#commentform')
-                    
-                    if comment_form_comment and commentform_id:
-                        result = {
-                            'url': url,
-                            'status_code': 202,
-                            'platform': 'WordPress',
-                            'indicator': 'WordPress dengan status 202 (comment-form-comment + commentform)',
-                            'title': self._get_title(parser),
-                            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-                        }
-                        
-                        with self.lock:
-                            self.wordpress_sites.append(result)
-                            self.wordpress_count += 1
-                            self._update_progress_description()
-                        
-                        return result
-                    
-                    # Check for Wix
-                    meta_tags = parser.css('meta[name="generator"]')
-                    for meta in meta_tags:
-                        content = meta.attributes.get('content', '').lower()
-                        if 'wix.com' in content:
-                            result = {
-                                'url': url,
-                                'status_code': 202,
-                                'platform': 'Wix',
-                                'indicator': f'Wix dengan status 202 ({meta.attributes.get("content")})',
-                                'title': self._get_title(parser),
-                                'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-                            }
-                            
-                            with self.lock:
-                                self.wix_sites.append(result)
-                                self.wix_count += 1
-                                self._update_progress_description()
-                            
-                            return result
-                    
-                    # Jika 202 tapi bukan Wix/WordPress, masuk Protected
-                    result = {
-                        'url': url,
-                        'status_code': 202,
-                        'platform': 'Protected',
-                        'indicator': 'Protected (202) - Website membatasi akses',
-                        'title': self._get_title(parser),
-                        'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-                    }
-                    
-                    with self.lock:
-                        self.no_template_sites.append(result)
-                        self.no_template_count += 1
-                        self._update_progress_description()
-                    
-                    return result
-                    
-                except Exception:
-                    # Jika gagal parse, tetap anggap protected
-                    result = {
-                        'url': url,
-                        'status_code': 202,
-                        'platform': 'Protected',
-                        'indicator': 'Status 202 - Tidak dapat menganalisis content',
-                        'title': 'Unknown',
-                        'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-                    }
-                    
-                    with self.lock:
-                        self.no_template_sites.append(result)
-                        self.no_template_count += 1
-                        self._update_progress_description()
-                    
-                    return result
-            
-            # ✅ UNTUK STATUS 200 DAN LAINNYA, LANJUTKAN NORMAL PROCESSING
-            response.raise_for_status()  # Ini akan raise jika ada error lain
-            
-            # Parse HTML untuk status sukses
-            parser = HTMLParser(response.text)
-            
-            # Check for WordPress
-            comment_form_comment = parser.css_first('.comment-form-comment')
-            commentform_id = parser.css_first('#commentform')
-            
-            if comment_form_comment and commentform_id:
-                result = {
-                    'url': url,
-                    'status_code': response.status_code,
-                    'platform': 'WordPress',
-                    'indicator': 'comment-form-comment class DAN commentform ID ditemukan',
-                    'title': self._get_title(parser),
-                    'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-                }
-                
-                with self.lock:
-                    self.wordpress_sites.append(result)
-                    self.wordpress_count += 1
-                    self._update_progress_description()
-                
-                return result
-            
-            # Check for Wix
-            meta_tags = parser.css('meta[name="generator"]')
-            
-            for meta in meta_tags:
-                content = meta.attributes.get('content', '').lower()
-                if 'wix.com' in content:
-                    result = {
-                        'url': url,
-                        'status_code': response.status_code,
-                        'platform': 'Wix',
-                        'indicator': meta.attributes.get('content'),
-                        'title': self._get_title(parser),
-                        'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-                    }
-                    
-                    with self.lock:
-                        self.wix_sites.append(result)
-                        self.wix_count += 1
-                        self._update_progress_description()
-                    
-                    return result
-            
-            # No template detected
-            result = {
-                'url': url,
-                'status_code': response.status_code,
-                'platform': 'NoTemplate',
-                'indicator': 'Tidak terdeteksi sebagai Wix atau WordPress',
-                'title': self._get_title(parser),
-                'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-            }
-            
-            with self.lock:
-                self.no_template_sites.append(result)
-                self.no_template_count += 1
-                self._update_progress_description()
-            
-            return result
-            
-        except httpx.HTTPStatusError as e:
-            # ✅ HANDLE HTTP STATUS ERRORS YANG TIDAK TERTANGKAP DI ATAS
-            status_code = e.response.status_code if e.response else 0
-            
-            if status_code == 404:
-                platform = 'Error'
-                indicator = 'Website tidak ditemukan (404 Not Found)'
-            elif status_code == 403:
-                platform = 'Protected'
-                indicator = 'Akses ditolak (403 Forbidden)'
-            elif status_code == 401:
-                platform = 'Protected'
-                indicator = 'Memerlukan autentikasi (401 Unauthorized)'
-            elif status_code == 429:
-                platform = 'Protected'
-                indicator = 'Rate limit exceeded (429 Too Many Requests)'
-            elif status_code >= 500:
-                platform = 'Error'
-                indicator = f'Server error ({status_code})'
-            else:
-                platform = 'Error'
-                indicator = f'HTTP Error ({status_code})'
-            
-            result = {
-                'url': url,
-                'status_code': status_code,
-                'platform': platform,
-                'indicator': indicator,
-                'title': 'Error',
-                'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-            }
-            
-            with self.lock:
-                self.no_template_sites.append(result)
-                self.no_template_count += 1
-                self._update_progress_description()
-            
+            outcome = await self._fetch_via_egress(client, url, headers, egress)
+            if self.capture_writer and outcome.capture:
+                with self._stage('capture_write'):
+                    self.capture_writer.write_response(url, outcome.redirect_chain, outcome.final_url, outcome.capture)
+
+            result = self._build_result(url, outcome)
+            self._record_result(result)
             return result
-            
+
         except httpx.RequestError as e:
             # ✅ HANDLE NETWORK ERRORS (DNS, Connection, Timeout, etc.)
-            result = {
-                'url': url,
+            result = self._build_result(url, FetchOutcome({
                 'status_code': 0,
                 'platform': 'Error',
                 'indicator': f'Network error: {str(e)[:100]}',
-                'title': 'Connection Error',
-                'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-            }
-            
-            with self.lock:
-                self.no_template_sites.append(result)
-                self.no_template_count += 1
-                self._update_progress_description()
-            
+                'title': 'Connection Error'
+            }, [], url))
+            self._record_result(result)
             return result
-            
+
         except Exception as e:
             # ✅ HANDLE UNEXPECTED ERRORS
-            result = {
-                'url': url,
+            result = self._build_result(url, FetchOutcome({
                 'status_code': 0,
                 'platform': 'Error',
                 'indicator': f'Unexpected error: {str(e)[:100]}',
-                'title': 'Unknown Error',
-                'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-            }
-            
-            with self.lock:
+                'title': 'Unknown Error'
+            }, [], url))
+            self._record_result(result)
+            return result
+
+        finally:
+            if self.pbar is not None:
+                with self._stage('progress_update'):
+                    self.pbar.update(1)
+
+    async def _fetch_via_egress(self, client: httpx.AsyncClient, url: str, headers: dict,
+                                egress: Optional[Egress]) -> FetchOutcome:
+        """Fetch URL lewat egress, ulangi lewat egress lain jika kegagalan disebabkan egress
+
+        Error proxy, source address yang tidak bisa di-bind atau 429 bukan hasil
+        milik situs target, jadi URL dicoba ulang (maksimal EGRESS_RETRIES kali)
+        lewat egress lain sebelum hasilnya dicatat.
+        """
+        host = urlparse(url).hostname or url
+        tried: List[Egress] = []
+        while True:
+            start = time.perf_counter()
+            error: Optional[httpx.RequestError] = None
+            try:
+                outcome = await self._fetch_with_deadline(client, url, headers)
+            except httpx.RequestError as e:
+                if egress is None:
+                    raise
+                error = e
+                egress_failed = egress.record(0, time.perf_counter() - start, error=e)
+            else:
+                if egress is None:
+                    return outcome
+                egress_failed = egress.record(outcome.request_status, outcome.request_seconds)
+
+            if not egress_failed:
+                if error is not None:
+                    raise error
+                return outcome
+
+            tried.append(egress)
+            retry = None
+            if self.egress_pool and len(tried) <= EGRESS_RETRIES:
+                retry = self.egress_pool.pick_other(host, tried)
+            if retry is None:
+                if error is not None:
+                    raise error
+                return outcome
+            self.egress_retries += 1
+            egress, client = retry, retry.client
+
+    def _build_result(self, url: str, outcome: FetchOutcome, timestamp: Optional[str] = None) -> dict:
+        """Gabungkan klasifikasi dan info redirect menjadi satu hasil scan"""
+        return {
+            'url': url,
+            **outcome.classification,
+            'redirect_chain': outcome.redirect_chain,
+            'final_url': outcome.final_url,
+            'final_host': urlparse(outcome.final_url).hostname or '',
+            'timestamp': timestamp or time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+
+    def _stage(self, name: str, spans_await: bool = False):
+        """Timer stage untuk --profile; no-op jika profiler tidak aktif"""
+        return self.profiler.stage(name, spans_await) if self.profiler else NULL_STAGE
+
+    @staticmethod
+    def _normalize_url(url: str) -> str:
+        """Tambahkan https:// jika URL belum punya skema"""
+        if not url.startswith(('http://', 'https://')):
+            return f'https://{url}'
+        return url
+
+    def _record_result(self, result: dict):
+        """Masukkan hasil ke kategori sesuai platform dan update counter"""
+        with self._stage('record'), self.lock:
+            if result['platform'] == 'Wix':
+                self.wix_sites.append(result)
+                self.wix_count += 1
+            elif result['platform'] == 'WordPress':
+                self.wordpress_sites.append(result)
+                self.wordpress_count += 1
+            else:
                 self.no_template_sites.append(result)
                 self.no_template_count += 1
-                self._update_progress_description()
-            
-            return result
-            
+            self._update_progress_description()
+
+    async def _fetch_with_deadline(self, client: httpx.AsyncClient, url: str, headers: dict) -> FetchOutcome:
+        """Fetch URL dengan total deadline untuk seluruh rantai redirect
+
+        Timeout connect/read httpx hanya berlaku per operasi, jadi server yang
+        mengirim byte pelan-pelan atau rantai redirect panjang bisa menahan slot
+        concurrent jauh lebih lama dari -t. Deadline di sini membatasi totalnya.
+        """
+        deadline = self._current_deadline()
+        start = time.perf_counter()
+        try:
+            fetched = await asyncio.wait_for(self._fetch_hedged(client, url, headers), deadline)
+        except asyncio.TimeoutError:
+            self.deadline_exceeded += 1
+            raise httpx.TimeoutException(f"Total deadline {deadline:.1f}s terlampaui")
+        self.latency.add(time.perf_counter() - start)
+        return fetched
+
+    def _current_deadline(self) -> float:
+        """Total deadline per URL: -t, atau p99 x multiplier jika adaptive"""
+        if self.adaptive_timeout and self.latency.count >= LatencyTracker.WARMUP_SAMPLES:
+            adaptive = self.latency.percentile(99) * ADAPTIVE_DEADLINE_MULTIPLIER
+            return min(self.timeout, max(ADAPTIVE_MIN_DEADLINE, adaptive))
+        return self.timeout
+
+    async def _fetch_hedged(self, client: httpx.AsyncClient, url: str, headers: dict) -> FetchOutcome:
+        """Kirim percobaan kedua jika request melewati p95, ambil yang selesai duluan"""
+        if not self.hedge or self.latency.count < LatencyTracker.WARMUP_SAMPLES:
+            return await self._fetch_url(client, url, headers)
+
+        primary = asyncio.ensure_future(self._fetch_url(client, url, headers))
+        hedge = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=self.latency.percentile(95))
+            if done:
+                return primary.result()
+
+            self.hedged_requests += 1
+            hedge_headers = {**headers, "User-Agent": self._get_random_user_agent()}
+            # Hedge tidak ikut single-flight: kalau primary memiliki/menunggu fetch
+            # redirect bersama yang macet, hedge harus benar-benar request baru
+            hedge = asyncio.ensure_future(self._follow_redirects(client, url, hedge_headers, self.max_redirects))
+            pending = {primary, hedge}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        return task.result()
+
+            # Kedua percobaan gagal, laporkan error dari request pertama
+            raise primary.exception()
         finally:
-            if self.pbar:
-                self.pbar.update(1)
-    
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    async def _fetch_url(self, client: httpx.AsyncClient, url: str, headers: dict) -> FetchOutcome:
+        """Fetch URL dan ikuti redirect secara manual
+
+        Setiap hop redirect digabung (single-flight) berdasarkan URL tujuan:
+        banyak domain parkir/expired redirect (sering lewat apex -> www atau
+        http -> https dulu) ke landing page registrar yang sama, jadi request
+        yang melewati URL yang sama berbagi satu fetch yang sedang berjalan
+        atau klasifikasi yang baru saja di-cache.
+        """
+        return await self._follow_redirects(client, url, headers, self.max_redirects, coalesce=True)
+
+    async def _follow_redirects(self, client: httpx.AsyncClient, url: str, headers: dict, budget: int,
+                                coalesce: bool = False) -> FetchOutcome:
+        """Ikuti rantai redirect dari URL
+
+        Cache hasil yang sudah selesai selalu dipakai. Dengan `coalesce`, setiap
+        hop juga mendaftarkan/menunggu fetch yang sedang berjalan untuk URL
+        yang sama. Fetch tidak menunggu flight yang pemiliknya (langsung atau
+        berantai) sedang menunggu fetch ini, sehingga redirect loop antar
+        domain tidak bisa membuat request saling menunggu (deadlock).
+        """
+        owner = object()
+        owned: List[Tuple[str, asyncio.Future, int]] = []
+        chain: List[str] = []
+        current = url
+        try:
+            while True:
+                if chain:
+                    cached = self._redirect_cache_get(current)
+                    if cached is not None:
+                        self.redirect_coalesced += coalesce
+                        outcome = cached._replace(redirect_chain=chain + cached.redirect_chain)
+                        break
+
+                    if coalesce:
+                        shared = await self._join_redirect_flight(current, owner)
+                        if shared is not None:
+                            outcome = shared._replace(redirect_chain=chain + shared.redirect_chain)
+                            break
+                        if current not in self._redirect_flights:
+                            flight = asyncio.get_running_loop().create_future()
+                            self._redirect_flights[current] = (flight, owner)
+                            owned.append((current, flight, len(chain)))
+
+                sent = time.perf_counter()
+                with self._stage('request', spans_await=True):
+                    response = await client.get(current, headers=headers, follow_redirects=False)
+                if not chain:
+                    first_hop = (response.status_code, time.perf_counter() - sent)
+                if not response.is_redirect or response.next_request is None:
+                    outcome = self._final_outcome(response, chain, current)
+                    break
+                if len(chain) >= budget:
+                    raise httpx.TooManyRedirects("Exceeded maximum allowed redirects.", request=response.request)
+
+                chain.append(current)
+                current = str(response.next_request.url)
+        except asyncio.CancelledError:
+            for _, flight, _ in owned:
+                flight.cancel()
+            raise
+        except Exception as e:
+            for _, flight, _ in owned:
+                flight.set_exception(e)
+                # Hindari warning "exception was never retrieved" jika tidak ada yang menunggu
+                flight.exception()
+            raise
+        else:
+            for target, flight, index in owned:
+                shared = outcome._replace(redirect_chain=outcome.redirect_chain[index:])
+                flight.set_result(shared)
+                self._redirect_cache_put(target, shared)
+        finally:
+            for target, _, _ in owned:
+                self._redirect_flights.pop(target, None)
+        return outcome._replace(request_status=first_hop[0], request_seconds=first_hop[1])
+
+    async def _join_redirect_flight(self, url: str, owner: object) -> Optional[FetchOutcome]:
+        """Tunggu fetch lain yang sedang berjalan untuk URL ini
+
+        Returns None jika tidak ada flight, menunggu akan deadlock, atau
+        pemilik flight dibatalkan; pemanggil lalu fetch sendiri.
+        """
+        entry = self._redirect_flights.get(url)
+        if entry is None:
+            return None
+        flight, flight_owner = entry
+        # Ikuti rantai "pemilik menunggu siapa"; jika kembali ke kita, menunggu = deadlock
+        waiter = flight_owner
+        while waiter is not None:
+            if waiter is owner:
+                return None
+            waiter = self._redirect_waits.get(waiter)
+
+        self.redirect_coalesced += 1
+        self._redirect_waits[owner] = flight_owner
+        try:
+            return await asyncio.shield(flight)
+        except asyncio.CancelledError:
+            task = asyncio.current_task()
+            # Jika task ini sendiri yang dibatalkan (deadline/hedge), jangan fetch ulang
+            if not flight.cancelled() or (hasattr(task, 'cancelling') and task.cancelling()):
+                raise
+            # Pemilik fetch bersama dibatalkan (deadline/hedge), fetch sendiri
+            return None
+        finally:
+            self._redirect_waits.pop(owner, None)
+
+    def _final_outcome(self, response: httpx.Response, chain: List[str], final_url: str) -> FetchOutcome:
+        """Klasifikasi response akhir, simpan snapshot-nya jika capture aktif"""
+        capture = self.capture_writer.snapshot(response) if self.capture_writer else None
+        with self._stage('classify'):
+            classification = self._classify_response(response)
+        return FetchOutcome(classification, chain, final_url, capture)
+
+    def _redirect_cache_get(self, url: str) -> Optional[FetchOutcome]:
+        """Ambil klasifikasi tujuan redirect yang baru saja di-fetch (LRU)"""
+        cached = self._redirect_cache.get(url)
+        if cached is None:
+            return None
+        if cached.capture and not self.capture_writer.has_record(cached.final_url, cached.capture):
+            # Cache tidak menyimpan body; tanpa record asli untuk dirujuk revisit, fetch ulang
+            return None
+        self._redirect_cache.move_to_end(url)
+        return cached
+
+    def _redirect_cache_put(self, url: str, value: FetchOutcome):
+        """Simpan klasifikasi tujuan redirect, buang entry paling lama jika penuh
+
+        Hanya hasil 2xx yang di-cache: 429/403/401/5xx dari landing page bisa
+        bersifat sementara dan tidak boleh dipakai ulang untuk domain lain.
+        """
+        if self.redirect_cache_size <= 0:
+            return
+        if not 200 <= value.classification['status_code'] < 300:
+            return
+        if value.capture:
+            # Body capture tidak ikut di-cache; hit berikutnya ditulis sebagai revisit
+            value = value._replace(capture=value.capture._replace(body=b''))
+        self._redirect_cache[url] = value
+        self._redirect_cache.move_to_end(url)
+        if value.redirect_chain:
+            # URL akhir juga bisa dituju langsung oleh redirect lain
+            self._redirect_cache[value.final_url] = value._replace(redirect_chain=[])
+            self._redirect_cache.move_to_end(value.final_url)
+        while len(self._redirect_cache) > self.redirect_cache_size:
+            self._redirect_cache.popitem(last=False)
+
+    def _classify_response(self, response: httpx.Response) -> dict:
+        """Klasifikasi response akhir menjadi status_code, platform, indicator dan title"""
+        # ✅ CHECK SPECIFIC STATUS CODES BEFORE raise_for_status()
+        if response.status_code == 404:
+            return {
+                'status_code': 404,
+                'platform': 'Error',
+                'indicator': 'Website tidak ditemukan (404 Not Found)',
+                'title': 'Page Not Found'
+            }
+
+        elif response.status_code == 403:
+            return {
+                'status_code': 403,
+                'platform': 'Protected',
+                'indicator': 'Akses ditolak (403 Forbidden) - Website mungkin diblokir atau dilindungi',
+                'title': 'Access Forbidden'
+            }
+
+        elif response.status_code == 401:
+            return {
+                'status_code': 401,
+                'platform': 'Protected',
+                'indicator': 'Memerlukan autentikasi (401 Unauthorized)',
+                'title': 'Authentication Required'
+            }
+
+        elif response.status_code == 429:
+            return {
+                'status_code': 429,
+                'platform': 'Protected',
+                'indicator': 'Rate limit exceeded (429 Too Many Requests) - Website membatasi akses',
+                'title': 'Rate Limited'
+            }
+
+        elif response.status_code >= 500:
+            return {
+                'status_code': response.status_code,
+                'platform': 'Error',
+                'indicator': f'Server error ({response.status_code}) - Website mengalami masalah server',
+                'title': 'Server Error'
+            }
+
+        # ✅ UNTUK STATUS 200 DAN LAINNYA, LANJUTKAN NORMAL PROCESSING
+        if response.status_code != 202:
+            try:
+                response.raise_for_status()  # Ini akan raise jika ada error lain
+            except httpx.HTTPStatusError:
+                return self._classify_http_error(response.status_code)
+
+        if self.content_memo_size <= 0:
+            return self._classify_content(response.status_code, response.text)
+
+        # Body identik (halaman parkir, placeholder hosting, challenge 202) cukup di-parse sekali
+        with self._stage('content_hash'):
+            memo_key = (
+                response.status_code,
+                response.encoding,
+                hashlib.blake2b(response.content, digest_size=16).digest()
+            )
+        cached = self._content_memo_get(memo_key)
+        if cached is not None:
+            return dict(cached)
+
+        classification = self._classify_content(response.status_code, response.text)
+        self._content_memo_put(memo_key, classification)
+        return dict(classification)
+
+    def _content_memo_get(self, key: tuple) -> Optional[dict]:
+        """Ambil klasifikasi untuk body yang sama persis (LRU)"""
+        self.content_memo_lookups += 1
+        cached = self._content_memo.get(key)
+        if cached is not None:
+            self.content_memo_hits += 1
+            self._content_memo.move_to_end(key)
+        return cached
+
+    def _content_memo_put(self, key: tuple, classification: dict):
+        """Simpan klasifikasi body, buang entry paling lama jika penuh"""
+        self._content_memo[key] = classification
+        while len(self._content_memo) > self.content_memo_size:
+            self._content_memo.popitem(last=False)
+
+    def _classify_content(self, status_code: int, text: str) -> dict:
+        """Deteksi platform dari isi HTML untuk status 202 dan status sukses"""
+        if status_code == 202:
+            # Parse content untuk cek apakah benar-benar protected
+            try:
+                parser = self._parse_html(text)
+
+                # Check for WordPress first
+                comment_form_comment = parser.css_first('.comment-form-comment')
+                commentform_id = parser.css_first('#commentform')
+
+                if comment_form_comment and commentform_id:
+                    return {
+                        'status_code': 202,
+                        'platform': 'WordPress',
+                        'indicator': 'WordPress dengan status 202 (comment-form-comment + commentform)',
+                        'title': self._get_title(parser)
+                    }
+
+                # Check for Wix
+                meta_tags = parser.css('meta[name="generator"]')
+                for meta in meta_tags:
+                    content = meta.attributes.get('content', '').lower()
+                    if 'wix.com' in content:
+                        return {
+                            'status_code': 202,
+                            'platform': 'Wix',
+                            'indicator': f'Wix dengan status 202 ({meta.attributes.get("content")})',
+                            'title': self._get_title(parser)
+                        }
+
+                # Jika 202 tapi bukan Wix/WordPress, masuk Protected
+                return {
+                    'status_code': 202,
+                    'platform': 'Protected',
+                    'indicator': 'Protected (202) - Website membatasi akses',
+                    'title': self._get_title(parser)
+                }
+
+            except Exception:
+                # Jika gagal parse, tetap anggap protected
+                return {
+                    'status_code': 202,
+                    'platform': 'Protected',
+                    'indicator': 'Status 202 - Tidak dapat menganalisis content',
+                    'title': 'Unknown'
+                }
+
+        # Parse HTML untuk status sukses
+        parser = self._parse_html(text)
+
+        # Check for WordPress
+        comment_form_comment = parser.css_first('.comment-form-comment')
+        commentform_id = parser.css_first('#commentform')
+
+        if comment_form_comment and commentform_id:
+            return {
+                'status_code': status_code,
+                'platform': 'WordPress',
+                'indicator': 'comment-form-comment class DAN commentform ID ditemukan',
+                'title': self._get_title(parser)
+            }
+
+        # Check for Wix
+        meta_tags = parser.css('meta[name="generator"]')
+
+        for meta in meta_tags:
+            content = meta.attributes.get('content', '').lower()
+            if 'wix.com' in content:
+                return {
+                    'status_code': status_code,
+                    'platform': 'Wix',
+                    'indicator': meta.attributes.get('content'),
+                    'title': self._get_title(parser)
+                }
+
+        # No template detected
+        return {
+            'status_code': status_code,
+            'platform': 'NoTemplate',
+            'indicator': 'Tidak terdeteksi sebagai Wix atau WordPress',
+            'title': self._get_title(parser)
+        }
+
+    def _classify_http_error(self, status_code: int) -> dict:
+        """✅ HANDLE HTTP STATUS ERRORS YANG TIDAK TERTANGKAP DI ATAS"""
+        if status_code == 404:
+            platform = 'Error'
+            indicator = 'Website tidak ditemukan (404 Not Found)'
+        elif status_code == 403:
+            platform = 'Protected'
+            indicator = 'Akses ditolak (403 Forbidden)'
+        elif status_code == 401:
+            platform = 'Protected'
+            indicator = 'Memerlukan autentikasi (401 Unauthorized)'
+        elif status_code == 429:
+            platform = 'Protected'
+            indicator = 'Rate limit exceeded (429 Too Many Requests)'
+        elif status_code >= 500:
+            platform = 'Error'
+            indicator = f'Server error ({status_code})'
+        else:
+            platform = 'Error'
+            indicator = f'HTTP Error ({status_code})'
+
+        return {
+            'status_code': status_code,
+            'platform': platform,
+            'indicator': indicator,
+            'title': 'Error'
+        }
+
+    def _parse_html(self, text: str) -> HTMLParser:
+        with self._stage('html_parse'):
+            return HTMLParser(text)
+
     def _get_title(self, parser: HTMLParser) -> str:
         """Extract page title"""
         title_tag = parser.css_first('title')
         return title_tag.text().strip() if title_tag else "Tidak ada judul"
     
-    async def scan_urls(self, urls: List[str], concurrent_limit: int = 10):
-        """Scan multiple URLs concurrently with progress bar"""
-        semaphore = asyncio.Semaphore(concurrent_limit)
-        self.pbar = tqdm(
-            total=len(urls),
+    async def scan_urls(self, urls: Iterable[str], concurrent_limit: int = 10):
+        """Scan multiple URLs concurrently with progress bar
+
+        `urls` boleh berupa list atau iterator (stream dari file/stdin);
+        URL diambil satu per satu oleh worker sehingga list besar tidak
+        pernah dimuat seluruhnya ke memori.
+        """
+        total = len(urls) if hasattr(urls, '__len__') else None
+        url_iter = iter(urls)
+        self.pbar = self._create_progress_bar(total)
+        if self.capture_path:
+            self.capture_writer = WarcWriter(self.capture_path, self.capture_body_limit)
+                
+        # Start timer updater untuk waktu yang berjalan
+        self.timer_task = asyncio.create_task(self._timer_updater())
+        monitor_task = None
+        if self.profiler:
+            self.profiler.start()
+            monitor_task = asyncio.create_task(self.profiler.monitor_loop())
+        
+        async def worker():
+            # Semua worker berbagi satu iterator, jumlah worker = batas concurrent
+            for url in url_iter:
+                host = urlparse(self._normalize_url(url)).hostname or url
+                egress = self.egress_pool.pick(host)
+                await self.check_single_url(egress.client, url, egress)
+
+        try:
+            self.egress_pool = EgressPool([
+                Egress(_egress_label(egress), self._make_client(egress), proxy=bool(egress and '://' in egress))
+                for egress in (self.egresses or [None])
+            ])
+            workers = [asyncio.ensure_future(worker()) for _ in range(max(1, concurrent_limit))]
+            try:
+                await asyncio.gather(*workers)
+            except BaseException:
+                # Worker yang crash menggagalkan scan, hentikan worker lain
+                for task in workers:
+                    task.cancel()
+                raise
+        finally:
+            if self.egress_pool:
+                await self.egress_pool.aclose()
+            if self.capture_writer:
+                self.capture_writer.close()
+
+            # Stop timer, profiler dan close progress bar
+            for task in (self.timer_task, monitor_task):
+                if task:
+                    task.cancel()
+                    try:
+                        await task
+                    except asyncio.CancelledError:
+                        pass
+            if self.profiler:
+                self.profiler.stop()
+            
+            if self.pbar is not None:
+                self.pbar.close()
+
+    def _create_progress_bar(self, total: Optional[int]) -> tqdm:
+        return tqdm(
+            total=total,
             unit="url",
             postfix="Wix: 0 | WordPress: 0 | NoTemplate: 0", 
             colour='green',
@@ -461,34 +1466,95 @@ class BxSpider:
             maxinterval=0.5,
             miniters=1
         )
-                
-        # Start timer updater untuk waktu yang berjalan
-        self.timer_task = asyncio.create_task(self._timer_updater())
-        
-        async def scan_with_semaphore(client: httpx.AsyncClient, url: str):
-            async with semaphore:
-                return await self.check_single_url(client, url)
-        
+
+    def replay_archive(self, path: str, processes: Optional[int] = None):
+        """Klasifikasi ulang record WARC hasil --capture tanpa akses network
+
+        Record dibaca secara streaming dan dikirim per batch ke beberapa proses
+        (default: jumlah core); jumlah batch yang antre dibatasi agar arsip besar
+        tidak dimuat seluruhnya ke memori.
+        """
+        processes = processes or os.cpu_count() or 1
+        records = iter_warc_responses(path)
+        batches = iter(lambda: list(itertools.islice(records, REPLAY_BATCH_SIZE)), [])
+        self.pbar = self._create_progress_bar(None)
+        if self.profiler:
+            self.profiler.start()
         try:
-            async with httpx.AsyncClient(
-                timeout=self.timeout,
-                follow_redirects=True,
-                max_redirects=self.max_redirects
-            ) as client:
-                tasks = [scan_with_semaphore(client, url) for url in urls]
-                results = await asyncio.gather(*tasks, return_exceptions=True)
+            if processes == 1:
+                for batch in batches:
+                    self._collect_replay(self._classify_replay_batch(batch))
+                return
+
+            with ProcessPoolExecutor(max_workers=processes, initializer=_replay_worker_init,
+                                     initargs=(self.content_memo_size,)) as executor:
+                pending = deque()
+                for batch in batches:
+                    pending.append(executor.submit(_replay_worker_batch, batch))
+                    if len(pending) >= processes * 4:
+                        self._collect_replay(*pending.popleft().result())
+                while pending:
+                    self._collect_replay(*pending.popleft().result())
         finally:
-            # Stop timer dan close progress bar
-            if self.timer_task:
-                self.timer_task.cancel()
-                try:
-                    await self.timer_task
-                except asyncio.CancelledError:
-                    pass
-            
-            if self.pbar:
+            if self.profiler:
+                self.profiler.stop()
+            if self.pbar is not None:
                 self.pbar.close()
+
+    def _classify_replay_batch(self, batch: List[Tuple[Dict[str, str], bytes]]) -> List[dict]:
+        """Klasifikasi satu batch record WARC dengan detektor yang sama seperti scan live"""
+        results = []
+        for headers, block in batch:
+            final_url = headers.get('warc-target-uri', '')
+            url = headers.get('warc-bx-scan-url', final_url)
+            chain = headers.get('warc-bx-redirect-chain', '').split()
+            captured = parse_captured_response(block, truncated='warc-truncated' in headers)
+            response = httpx.Response(
+                captured.status_code,
+                headers=captured.headers,
+                content=captured.body,
+                request=httpx.Request('GET', final_url)
+            )
+            try:
+                with self._stage('classify'):
+                    classification = self._classify_response(response)
+            except Exception as e:
+                classification = {
+                    'status_code': 0,
+                    'platform': 'Error',
+                    'indicator': f'Unexpected error: {str(e)[:100]}',
+                    'title': 'Unknown Error'
+                }
+
+            # Timestamp dari waktu capture (WARC-Date UTC), dikonversi ke waktu lokal
+            # seperti hasil scan live
+            timestamp = None
+            if headers.get('warc-date'):
+                captured_at = calendar.timegm(time.strptime(headers['warc-date'], '%Y-%m-%dT%H:%M:%SZ'))
+                timestamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(captured_at))
+
+            result = self._build_result(url, FetchOutcome(classification, chain, final_url), timestamp)
+            if captured.truncated:
+                # Detektor hanya melihat potongan body, hasil bisa berbeda dari scan live
+                result['capture_truncated'] = True
+            results.append(result)
+        return results
+
+    def _collect_replay(self, results: List[dict], memo_hits: int = 0, memo_lookups: int = 0):
+        self.content_memo_hits += memo_hits
+        self.content_memo_lookups += memo_lookups
+        for result in results:
+            self.scanned_urls.add(result['url'])
+            self.replay_truncated += result.get('capture_truncated', False)
+            self._record_result(result)
+            if self.pbar is not None:
+                self.pbar.update(1)
     
+    @staticmethod
+    def _redirect_note(site: dict) -> str:
+        """Host tujuan akhir untuk listing, hanya jika URL di-redirect"""
+        return f" -> {site['final_host']}" if site['redirect_chain'] else ''
+
     def print_results(self):
         """Print comprehensive scan results with detailed statistics"""
     
@@ -506,6 +1572,27 @@ class BxSpider:
         print(f"🛡️ Situs Protected: {len(protected_sites)}{W}")
         print(f"❌ Situs Error: {len(error_sites)}{W}")
         print(f"🔍 Situs Platform Lain: {len(regular_no_template)}{W}")
+        if self.redirect_coalesced:
+            print(f"🔁 Redirect digabung (landing page sama): {self.redirect_coalesced}{W}")
+        if self.content_memo_lookups:
+            hit_rate = self.content_memo_hits / self.content_memo_lookups * 100
+            print(f"🧠 Memo konten: {self.content_memo_hits}/{self.content_memo_lookups} hit ({hit_rate:.1f}%){W}")
+        if self.replay_truncated:
+            print(f"{Y}⚠️  Replay dari body terpotong: {self.replay_truncated} (hasil bisa berbeda dari scan live, "
+                  f"naikkan --capture-body-limit){W}")
+        if self.latency.count:
+            print(f"⏱️  Latency p50/p95/p99: {self.latency.percentile(50):.2f}s / "
+                  f"{self.latency.percentile(95):.2f}s / {self.latency.percentile(99):.2f}s{W}")
+        if self.deadline_exceeded:
+            print(f"⌛ Melewati total deadline: {self.deadline_exceeded}{W}")
+        if self.hedged_requests:
+            print(f"🔀 Hedged request: {self.hedged_requests} (hedge menang: {self.hedge_wins}){W}")
+        if self.egress_pool and len(self.egress_pool.egresses) > 1:
+            print(f"\n{Y}🌐 EGRESS POOL:{W} (URL diulang lewat egress lain: {self.egress_retries})")
+            for egress in self.egress_pool.egresses:
+                print(f"  {W}├─ {G}{egress.name}{W}: {egress.requests} req | error {egress.errors} | "
+                      f"429 {egress.throttled} | latency {egress.latency:.2f}s | "
+                      f"skor {egress.score:.2f} | cooldown {egress.cooldowns}x")
     
         # ✅ DETAILED BREAKDOWN
         if protected_sites:
@@ -558,12 +1645,12 @@ class BxSpider:
         if protected_sites:
             print(f"\n{Y}🛡️  SITUS PROTECTED {W}{len(protected_sites)}:{W}")
             for i, site in enumerate(protected_sites, 1):
-                print(f"  [{i}] {site['url']} | Status: {Y}{site['status_code']} {W}| {site['indicator'][:50]}...")
+                print(f"  [{i}] {site['url']}{self._redirect_note(site)} | Status: {Y}{site['status_code']} {W}| {site['indicator'][:50]}...")
 
         if error_sites:
             print(f"\n{R}❌ SITUS ERROR {W}{len(error_sites)}:{W}")
             for i, site in enumerate(error_sites, 1):
-                print(f"  [{i}] {site['url']} | Status: {R}{site['status_code']} {W}| {site['indicator'][:50]}...")
+                print(f"  [{i}] {site['url']}{self._redirect_note(site)} | Status: {R}{site['status_code']} {W}| {site['indicator'][:50]}...")
 
         if regular_no_template:
             print(f"\n{ungu}🔍 SITUS PLATFORM LAIN {W}{len(regular_no_template)}:{W}")
@@ -666,7 +1753,7 @@ class BxSpider:
                         for status_code in sorted(status_groups.keys()):
                             f.write(f"--- STATUS {status_code} ---\n")
                             for site in status_groups[status_code]:
-                                f.write(f"{site['url']}\n")
+                                f.write(f"{site['url']}{self._redirect_note(site)}\n")
                             f.write("\n")
                 
                     print(f"{W}[{G}INFO{W}] {len(protected_sites)} Protected sites {Y}→ {G}protected_sites.txt{W}")
@@ -708,7 +1795,7 @@ class BxSpider:
                                 f.write(f"--- STATUS {status_code} ---\n")
                         
                             for site in error_groups[status_code]:
-                                f.write(f"{site['url']}\n")
+                                f.write(f"{site['url']}{self._redirect_note(site)}\n")
                             f.write("\n")
                 
                     print(f"{W}[{G}INFO{W}] {len(error_sites)} Error sites {Y}→ {G}error_sites.txt{W}")
@@ -743,18 +1830,136 @@ class BxSpider:
             print(f"{R}[ERROR] Gagal menyimpan hasil: {str(e)}{W}")
 
 
-def load_urls_from_file(filename: str) -> List[str]:
-    """Load URLs from text file"""
+COMPRESSED_SUFFIXES = ('.gz', '.bz2', '.xz', '.zst')
+# Error baca/decompress di tengah stream (file terpotong, data korup, I/O error)
+URL_SOURCE_READ_ERRORS = (OSError, EOFError, zlib.error, lzma.LZMAError) + ((zstandard.ZstdError,) if zstandard else ())
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parse argumen --shard berformat i/n (1 <= i <= n)"""
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Format shard tidak valid: {value} (gunakan i/n, contoh 1/4)")
+    if count < 1 or not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"Shard di luar jangkauan: {value} (1 <= i <= n)")
+    return index, count
+
+
+def _open_text_source(filename: str) -> io.TextIOBase:
+    """Buka sumber URL sebagai text stream: stdin ('-'), .gz, .bz2, .xz, .zst atau file biasa"""
+    if filename == '-':
+        return io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', errors='replace')
+    if filename.endswith('.gz'):
+        return gzip.open(filename, 'rt', encoding='utf-8', errors='replace')
+    if filename.endswith('.bz2'):
+        return bz2.open(filename, 'rt', encoding='utf-8', errors='replace')
+    if filename.endswith('.xz'):
+        return lzma.open(filename, 'rt', encoding='utf-8', errors='replace')
+    if filename.endswith('.zst'):
+        if zstandard is None:
+            raise RuntimeError("Modul zstandard belum terpasang (pip install zstandard)")
+        raw = open(filename, 'rb')
+        reader = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return io.TextIOWrapper(reader, encoding='utf-8', errors='replace')
+    return open(filename, 'r', encoding='utf-8', errors='replace')
+
+
+def _shard_bounds(mm: mmap.mmap, index: int, count: int) -> Tuple[int, int]:
+    """Hitung range byte shard ke-index (1-based), disejajarkan ke awal baris
+
+    Sebuah baris menjadi milik shard yang range-nya memuat byte pertama baris
+    tersebut, sehingga setiap baris diproses tepat satu kali oleh satu shard.
+    """
+    size = len(mm)
+
+    def align(offset: int) -> int:
+        if offset <= 0:
+            return 0
+        if offset >= size:
+            return size
+        if mm[offset - 1:offset] == b'\n':
+            return offset
+        newline = mm.find(b'\n', offset)
+        return size if newline == -1 else newline + 1
+
+    return align(size * (index - 1) // count), align(size * index // count)
+
+
+def _iter_mmap_lines(f, index: int, count: int) -> Iterator[str]:
+    """Stream baris dari potongan file (shard) tanpa membaca seluruh file"""
+    if os.fstat(f.fileno()).st_size == 0:
+        return
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        pos, end = _shard_bounds(mm, index, count)
+        while pos < end:
+            newline = mm.find(b'\n', pos, end)
+            stop = end if newline == -1 else newline + 1
+            yield mm[pos:stop].decode('utf-8', errors='replace')
+            pos = stop
+
+
+def _iter_stream_lines(stream: io.TextIOBase, shard: Optional[Tuple[int, int]] = None) -> Iterator[str]:
+    """Stream baris dari sumber yang tidak bisa di-seek, opsional dibagi per nomor baris"""
+    lines = iter(stream)
+    if shard:
+        index, count = shard
+        lines = itertools.islice(lines, index - 1, None, count)
+    return lines
+
+
+class UrlSourceError(Exception):
+    """File input gagal dibaca/di-decompress di tengah stream (scan tidak boleh dianggap selesai)"""
+
+
+def iter_urls_from_file(filename: str, shard: Optional[Tuple[int, int]] = None) -> Iterator[str]:
+    """Stream URLs dari file, file terkompresi atau stdin ('-') secara lazy
+
+    Dengan `shard=(i, n)` hanya bagian ke-i dari n yang dibaca. File teks biasa
+    dibagi berdasarkan range byte (mmap); stdin dan file terkompresi tidak bisa
+    di-seek, jadi dibagi per nomor baris (baris ke-k masuk shard k mod n).
+
+    Hanya file yang tidak ada yang dilaporkan lalu dianggap kosong. Error saat
+    membaca (file .gz/.zst terpotong, I/O error) dinaikkan sebagai
+    UrlSourceError agar scan gagal, bukan selesai dengan list yang terpotong.
+    """
+    mmap_shard = shard and filename != '-' and not filename.endswith(COMPRESSED_SUFFIXES)
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            urls = [line.strip() for line in f if line.strip() and not line.startswith('#')]
-        return urls
+        source = open(filename, 'rb') if mmap_shard else _open_text_source(filename)
     except FileNotFoundError:
         print(f"[ERROR] File tidak ditemukan: {filename}")
-        return []
-    except Exception as e:
-        print(f"[ERROR] Gagal membaca file {filename}: {str(e)}")
-        return []
+        return
+
+    with source:
+        lines = _iter_mmap_lines(source, *shard) if mmap_shard else _iter_stream_lines(source, shard)
+        try:
+            for line in lines:
+                if line.strip() and not line.startswith('#'):
+                    yield line.strip()
+        except URL_SOURCE_READ_ERRORS as e:
+            raise UrlSourceError(f"Gagal membaca file {filename}: {e}") from e
+
+
+REPLAY_BATCH_SIZE = 256
+_replay_spider: Optional[BxSpider] = None
+
+
+def _replay_worker_init(content_memo_size: int):
+    """Initializer proses replay: satu BxSpider (dan memo konten) per proses"""
+    global _replay_spider
+    _replay_spider = BxSpider(content_memo_size=content_memo_size, load_user_agents=False)
+
+
+def _replay_worker_batch(batch: List[Tuple[Dict[str, str], bytes]]) -> Tuple[List[dict], int, int]:
+    spider = _replay_spider
+    hits, lookups = spider.content_memo_hits, spider.content_memo_lookups
+    results = spider._classify_replay_batch(batch)
+    return results, spider.content_memo_hits - hits, spider.content_memo_lookups - lookups
+
+
+def load_urls_from_file(filename: str) -> List[str]:
+    """Load URLs from text file"""
+    return list(iter_urls_from_file(filename))
 
 async def main():
     parser = argparse.ArgumentParser(
@@ -765,52 +1970,163 @@ Contoh penggunaan:
   python bx_spider.py -u example.com
   python bx_spider.py -f urls.txt
   python bx_spider.py -u example.com -o results.txt -c 20
+  python bx_spider.py -f urls.txt.gz --shard 1/4
+  cat urls.txt | python bx_spider.py -f -
+  python bx_spider.py -f urls.txt --capture scan.warc.gz
+  python bx_spider.py --replay scan.warc.gz
         """
     )
     
     parser.add_argument('-u', '--urls', nargs='+', help='URL yang akan dipindai')
-    parser.add_argument('-f', '--file', help='File berisi URL (satu per baris)')
+    parser.add_argument('-f', '--file', help='File berisi URL (satu per baris), mendukung .gz/.bz2/.xz/.zst atau - untuk stdin')
     parser.add_argument('-o', '--output', help='File output untuk hasil Wix')
     parser.add_argument('-c', '--concurrent', type=int, default=10, help='Jumlah request bersamaan (default: 10)')
-    parser.add_argument('-t', '--timeout', type=int, default=10, help='Timeout request dalam detik per ulrs (default: 10)')
+    parser.add_argument('-t', '--timeout', type=int, default=10, help='Total deadline per URL dalam detik, termasuk semua redirect (default: 10)')
+    parser.add_argument('--connect-timeout', type=float, help='Timeout koneksi (TCP + TLS) dalam detik (default: sama dengan -t)')
+    parser.add_argument('--read-timeout', type=float, help='Timeout menunggu byte pertama/berikutnya dalam detik (default: sama dengan -t)')
+    parser.add_argument('--adaptive-timeout', action='store_true', help='Turunkan total deadline otomatis dari p99 latency yang teramati (maksimal -t)')
+    parser.add_argument('--hedge', action='store_true', help='Kirim percobaan kedua jika request melewati p95 latency')
+    parser.add_argument('--redirect-cache', type=int, default=10000, help='Jumlah tujuan redirect yang klasifikasinya di-cache, 0 untuk menonaktifkan (default: 10000)')
+    parser.add_argument('--content-memo', type=int, default=10000, help='Jumlah klasifikasi body identik yang di-cache, 0 untuk menonaktifkan (default: 10000)')
+    parser.add_argument('--egress', nargs='+', help='Pool egress: URL proxy (http://, socks5://), source IP lokal, atau direct')
+    parser.add_argument('--egress-file', help='File berisi daftar egress (satu per baris)')
+    parser.add_argument('--shard', type=parse_shard, metavar='i/n', help='Hanya pindai bagian ke-i dari n bagian file input (contoh: 1/4)')
+    parser.add_argument('--capture', metavar='ARCHIVE', help='Simpan response (status, header, potongan body) ke arsip WARC (.warc atau .warc.gz)')
+    parser.add_argument('--capture-body-limit', type=int, default=DEFAULT_CAPTURE_BODY_LIMIT, help=f'Maksimal byte body per response di arsip (default: {DEFAULT_CAPTURE_BODY_LIMIT})')
+    parser.add_argument('--replay', metavar='ARCHIVE', help='Klasifikasi ulang arsip WARC hasil --capture tanpa akses network')
+    parser.add_argument('--workers', type=int, help='Jumlah proses untuk --replay (default: jumlah core CPU)')
+    parser.add_argument('--profile', nargs='?', const=DEFAULT_PROFILE_FILE, metavar='FILE', help=f'Profiling event loop dan stage check_single_url, stack ditulis dalam format folded untuk flamegraph (default: {DEFAULT_PROFILE_FILE})')
     
     args = parser.parse_args()
     
-    # Collect URLs
-    urls = []
-    if args.urls:
-        urls.extend(args.urls)
+    # Collect URLs (file di-stream secara lazy, tidak dimuat seluruhnya)
+    urls = list(args.urls or [])
+    if args.shard and args.shard[0] != 1:
+        # URL dari -u hanya dipindai oleh shard pertama, bukan oleh setiap shard
+        urls = []
+    url_source: Iterable[str] = urls
     if args.file:
-        urls.extend(load_urls_from_file(args.file))
+        url_source = itertools.chain(urls, iter_urls_from_file(args.file, args.shard))
+        try:
+            first = next(url_source, None)
+        except UrlSourceError as e:
+            print(f"[ERROR] {e}")
+            sys.exit(1)
+        except (RuntimeError, OSError) as e:
+            print(f"[ERROR] Gagal membaca file {args.file}: {str(e)}")
+            sys.exit(1)
+        url_source = itertools.chain([first], url_source) if first is not None else []
+    
+    if args.replay:
+        await replay(args)
+        return
     
-    if not urls:
-        print("[ERROR] Tidak ada URL yang diberikan. Gunakan opsi -u atau -f.")
+    if not url_source:
+        print("[ERROR] Tidak ada URL yang diberikan. Gunakan opsi -u, -f atau --replay.")
         parser.print_help()
         sys.exit(1)
     
+    # Egress pool (proxy/source address); 'direct' berarti tanpa proxy
+    egresses = list(args.egress or [])
+    if args.egress_file:
+        try:
+            from_file = list(iter_urls_from_file(args.egress_file))
+        except UrlSourceError as e:
+            print(f"[ERROR] {e}")
+            sys.exit(1)
+        if not from_file:
+            # Jangan diam-diam scan dari IP direct yang justru ingin dihindari
+            print(f"[ERROR] Tidak ada egress di {args.egress_file}")
+            sys.exit(1)
+        egresses.extend(from_file)
+    egresses = [None if egress.lower() == 'direct' else egress for egress in egresses]
+    if any(egress and egress.lower().startswith('socks') for egress in egresses):
+        try:
+            import socksio  # noqa: F401
+        except ImportError:
+            print('[ERROR] Proxy SOCKS membutuhkan: pip install "httpx[socks]"')
+            sys.exit(1)
+    
     # Initialize spider
-    spider = BxSpider(timeout=args.timeout)
+    spider = BxSpider(timeout=args.timeout, redirect_cache_size=args.redirect_cache,
+                      content_memo_size=args.content_memo, connect_timeout=args.connect_timeout,
+                      read_timeout=args.read_timeout, adaptive_timeout=args.adaptive_timeout,
+                      hedge=args.hedge, egresses=egresses, capture_path=args.capture,
+                      capture_body_limit=args.capture_body_limit,
+                      profiler=Profiler(args.profile) if args.profile else None)
     
     print(f"{ungu}[{W}INFO{ungu}] {W}Memulai Crawler Bx-Spider")
-    print(f"{ungu}[{W}INFO{ungu}] {W}URL yang akan dipindai: {G}{len(urls)}")
+    if args.file:
+        print(f"{ungu}[{W}INFO{ungu}] {W}URL yang akan dipindai: {G}stream dari {args.file}")
+    else:
+        print(f"{ungu}[{W}INFO{ungu}] {W}URL yang akan dipindai: {G}{len(urls)}")
+    if args.shard:
+        print(f"{ungu}[{W}INFO{ungu}] {W}Shard: {G}{args.shard[0]}/{args.shard[1]}")
     print(f"{ungu}[{W}INFO{ungu}] {W}Request bersamaan: {G}{args.concurrent}")
-    print(f"{ungu}[{W}INFO{ungu}] {W}Timeout: {G}{args.timeout}s")
-    print(f"{ungu}{"─" *37}")
+    if egresses:
+        print(f"{ungu}[{W}INFO{ungu}] {W}Egress pool: {G}{len(egresses)}")
+    print(f"{ungu}[{W}INFO{ungu}] {W}Timeout: {G}{args.timeout}s"
+          f"{W} (connect {G}{spider.connect_timeout}s{W}, read {G}{spider.read_timeout}s{W})")
+    if args.adaptive_timeout or args.hedge:
+        print(f"{ungu}[{W}INFO{ungu}] {W}Adaptive deadline: {G}{'ya' if args.adaptive_timeout else 'tidak'}"
+              f"{W} | Hedged request: {G}{'ya' if args.hedge else 'tidak'}")
+    if args.capture:
+        print(f"{ungu}[{W}INFO{ungu}] {W}Capture WARC: {G}{args.capture}")
+    if args.profile:
+        print(f"{ungu}[{W}INFO{ungu}] {W}Profiling aktif: {G}{args.profile}")
+    print(f"{ungu}{'─' *37}")
 
     
     # Start scanning
     start_time = time.time()
-    await spider.scan_urls(urls, concurrent_limit=args.concurrent)
+    try:
+        await spider.scan_urls(url_source, concurrent_limit=args.concurrent)
+    except UrlSourceError as e:
+        print(f"\n{R}[ERROR] {e} - pemindaian dihentikan, hasil tidak lengkap{W}")
+        sys.exit(1)
     end_time = time.time()
     
     # Print results
     spider.print_results()
+    if spider.capture_writer:
+        writer = spider.capture_writer
+        print(f"💾 Capture: {writer.records - 1} record di {writer.path} ({writer.revisits} revisit, body tidak disalin ulang){W}")
+    if spider.profiler:
+        spider.profiler.print_report()
     print(f"{G}\nCrawling selesai dalam {end_time - start_time:.2f} detik")
     
     # Save results
     if args.output or spider.wix_sites or spider.wordpress_sites or spider.no_template_sites:
         spider.save_results(args.output)
 
+async def replay(args: argparse.Namespace):
+    """Mode --replay: jalankan detektor atas arsip WARC tanpa network"""
+    spider = BxSpider(content_memo_size=args.content_memo, load_user_agents=False,
+                      profiler=Profiler(args.profile) if args.profile else None)
+    
+    print(f"{ungu}[{W}INFO{ungu}] {W}Replay arsip: {G}{args.replay}")
+    print(f"{ungu}[{W}INFO{ungu}] {W}Proses: {G}{args.workers or os.cpu_count()}")
+    print(f"{ungu}{'─' *37}")
+    
+    start_time = time.time()
+    try:
+        spider.replay_archive(args.replay, processes=args.workers)
+    except FileNotFoundError:
+        print(f"[ERROR] File tidak ditemukan: {args.replay}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"[ERROR] Gagal membaca arsip {args.replay}: {str(e)}")
+        sys.exit(1)
+    end_time = time.time()
+    
+    spider.print_results()
+    if spider.profiler:
+        spider.profiler.print_report()
+    print(f"{G}\nReplay selesai dalam {end_time - start_time:.2f} detik")
+    
+    if args.output or spider.wix_sites or spider.wordpress_sites or spider.no_template_sites:
+        spider.save_results(args.output)
+
 if __name__ == "__main__":
     try:
         clear_terminal()